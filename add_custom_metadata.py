@@ -4,9 +4,57 @@ Script to add custom metadata properties to metadata_trap.csv
 """
 
 import os
-import subprocess
 from datetime import datetime
 
+# Impossible future timestamp planted on the trap file
+TRAP_DATE = datetime(2026, 12, 25)
+
+# Seconds between the Windows FILETIME epoch (1601) and the Unix epoch (1970)
+_FILETIME_EPOCH_OFFSET = 11644473600
+
+def set_file_times(path, when):
+    """Set access, modification and (on Windows) creation time of a file"""
+    timestamp = when.timestamp()
+    os.utime(path, (timestamp, timestamp))
+    
+    if os.name != 'nt':
+        return
+    
+    import ctypes
+    from ctypes import wintypes
+    
+    FILE_WRITE_ATTRIBUTES = 0x100
+    FILE_SHARE_READ_WRITE = 0x1 | 0x2
+    OPEN_EXISTING = 3
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    
+    handle = kernel32.CreateFileW(str(path), FILE_WRITE_ATTRIBUTES, FILE_SHARE_READ_WRITE, None, OPEN_EXISTING, 0, None)
+    if handle == wintypes.HANDLE(-1).value:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        # FILETIME counts 100 ns intervals since 1601-01-01
+        ticks = int((timestamp + _FILETIME_EPOCH_OFFSET) * 10_000_000)
+        creation = wintypes.FILETIME(ticks & 0xFFFFFFFF, ticks >> 32)
+        if not kernel32.SetFileTime(handle, ctypes.byref(creation), None, None):
+            raise ctypes.WinError(ctypes.get_last_error())
+    finally:
+        kernel32.CloseHandle(handle)
+
+def set_extended_properties(path):
+    """Write Author/Title/Comments through the Windows property system (pywin32)"""
+    import pythoncom
+    from win32com.propsys import propsys, pscon
+    from win32com.shell import shellcon
+    
+    store = propsys.SHGetPropertyStoreFromParsingName(
+        os.path.abspath(path), None, shellcon.GPS_READWRITE, propsys.IID_IPropertyStore
+    )
+    store.SetValue(pscon.PKEY_Author, propsys.PROPVARIANTType(["Admin-99"], pythoncom.VT_VECTOR | pythoncom.VT_BSTR))
+    store.SetValue(pscon.PKEY_Title, propsys.PROPVARIANTType("Forensic Test File"))
+    store.SetValue(pscon.PKEY_Comment, propsys.PROPVARIANTType("Authorized via Proxy-77"))
+    store.Commit()
+
 def add_custom_metadata():
     """Add custom metadata properties to the CSV file"""
     
@@ -17,45 +65,16 @@ def add_custom_metadata():
         return False
     
     try:
-        # Create a PowerShell script to add custom metadata
-        ps_script = f'''
-        $file = Get-Item "{csv_file}"
-        
         # Set standard properties
-        $file.CreationTime = "2026-12-25"
-        $file.LastWriteTime = "2026-12-25"
-        $file.LastAccessTime = "2026-12-25"
+        set_file_times(csv_file, TRAP_DATE)
         
         # Try to add custom metadata (this may not work on all systems)
-        try {{
-            # This is a Windows-specific approach using Shell.Application
-            $shell = New-Object -ComObject Shell.Application
-            $folder = $shell.Namespace((Resolve-Path "."))
-            $item = $folder.ParseName("{csv_file}")
-            
-            # Set author property (if supported)
-            $item.ExtendedProperty("Author") = "Admin-99"
-            $item.ExtendedProperty("Title") = "Forensic Test File"
-            $item.ExtendedProperty("Comments") = "Authorized via Proxy-77"
-            
-            Write-Host "Custom metadata added successfully"
-        }} catch {{
-            Write-Warning "Could not add custom metadata properties"
-            Write-Warning "This is expected on some systems"
-        }}
-        '''
-        
-        # Run the PowerShell script
-        result = subprocess.run(['powershell', '-Command', ps_script], 
-                              capture_output=True, text=True)
-        
-        if result.returncode == 0:
+        try:
+            set_extended_properties(csv_file)
             print("✓ Custom metadata properties set successfully")
-        else:
+        except Exception as e:
             print("⚠ Custom metadata properties could not be set (this is expected on some systems)")
-            print(f"PowerShell output: {result.stdout}")
-            if result.stderr:
-                print(f"PowerShell errors: {result.stderr}")
+            print(f"Details: {e}")
         
         # Create a summary of what was done
         summary = f"""
@@ -1,11 +1,15 @@
-import io
+import codecs
+import hashlib
+import json
 import os
-from typing import Any, Dict, Optional
-import pandas as pd
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
 import streamlit as st
 from dotenv import load_dotenv
-from groq import Groq
-from forensics.forensic_tools import calculate_file_hashes, get_file_type, analyze_file_metadata
+from forensics.forensic_tools import calculate_file_hashes, get_file_type, analyze_file_content
 
 # Load environment variables at the very top
 load_dotenv()
@@ -36,17 +40,90 @@ st.set_page_config(page_title="Axiom Forge Truth OS", layout="wide")
 # Inject Custom CSS
 local_css("styles.css")
 
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_cached_file_metadata(file_id: str, _uploaded_file: Any) -> Optional[Dict]:
+    """Analyze an upload in place once; reruns for the same file_id reuse the result."""
+    # getvalue() shares the upload's buffer, so hashing reads it without copies
+    return analyze_file_content(_uploaded_file.getvalue(), _uploaded_file.name)
+
+# Files per batched Groq request; keeps the prompt well inside the context window.
+AI_BATCH_SIZE = 8
+
+# Keywords in the AI verdict that escalate the threat level, matched in one scan.
+BREACH_KEYWORDS = ('malicious', 'breach', 'tampered', 'anomaly')
+_BREACH_RE = re.compile('|'.join(map(re.escape, BREACH_KEYWORDS)), re.IGNORECASE)
+
+# Groq free-tier limits for llama-3.3-70b-versatile.
+GROQ_REQUESTS_PER_MINUTE = 30
+GROQ_TOKENS_PER_MINUTE = 6000
+
+@st.cache_resource(show_spinner=False)
+def _groq_client(api_key: str) -> Any:
+    """One Groq client (and its keep-alive connection pool) shared by all sessions."""
+    from groq import Groq
+    return Groq(api_key=api_key)
+
+@st.cache_resource(show_spinner=False)
+def _groq_rate_window() -> Dict[str, Any]:
+    """Sliding one-minute window of (timestamp, tokens) per Groq call, shared by all sessions."""
+    return {"lock": threading.Lock(), "calls": deque()}
+
+def _throttle_groq(tokens: int) -> None:
+    """Block until a call of ~`tokens` fits under the per-minute request and token limits."""
+    window = _groq_rate_window()
+    with window["lock"]:
+        calls = window["calls"]
+        while calls:
+            now = time.monotonic()
+            while calls and now - calls[0][0] >= 60:
+                calls.popleft()
+            if len(calls) < GROQ_REQUESTS_PER_MINUTE and sum(t for _, t in calls) + tokens <= GROQ_TOKENS_PER_MINUTE:
+                break
+            if calls:
+                time.sleep(60 - (now - calls[0][0]))
+        calls.append((time.monotonic(), tokens))
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _groq_complete(prompt_hash: str, _api_key: str, _prompt: str, json_mode: bool = False) -> str:
+    """Run one chat completion; repeats of the same prompt within the TTL hit the cache."""
+    client = _groq_client(_api_key)
+    
+    # Pace calls client-side instead of tripping 429s (~4 characters per token)
+    _throttle_groq(len(_prompt) // 4)
+    
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+    completion = client.chat.completions.create(
+        model="llama-3.3-70b-versatile",
+        messages=[{"role": "system", "content": "You are a forensic expert AI."}, {"role": "user", "content": _prompt}],
+        temperature=0.3,
+        **extra
+    )
+    return completion.choices[0].message.content
+
+def _prompt_text(file_data: Any, limit: int) -> str:
+    """Safely decode file content into a prompt snippet of at most `limit` characters."""
+    if not isinstance(file_data, (bytes, bytearray, memoryview)):
+        return str(file_data)[:limit]
+    
+    # Decode only as much as the snippet needs instead of the whole file
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    view = memoryview(file_data)
+    step = 4 * limit
+    text = ''
+    for start in range(0, len(view), step):
+        text += decoder.decode(view[start:start + step])
+        if len(text) >= limit:
+            break
+    else:
+        text += decoder.decode(b'', final=True)
+    return text[:limit]
+
 def get_direct_ai_insights(file_data: Any, file_metadata: Optional[Dict] = None) -> str:
     """Get AI insights with safe decode for the prompt."""
     api_key = os.environ.get("GROQ_API_KEY")
     if not api_key: return "API Key Missing."
     
-    client = Groq(api_key=api_key)
-    
-    if isinstance(file_data, (bytes, bytearray)):
-        clean_text = file_data.decode('utf-8', errors='ignore')[:5000]
-    else:
-        clean_text = str(file_data)[:5000]
+    clean_text = _prompt_text(file_data, 5000)
 
     # Build prompt with metadata if available
     prompt = f"Analyze this forensic data for anomalies:\n\nFile Content:\n{clean_text}\n\n"
@@ -59,12 +136,46 @@ def get_direct_ai_insights(file_data: Any, file_metadata: Optional[Dict] = None)
         prompt += f"- MD5: {file_metadata.get('hashes', {}).get('md5', 'Unknown')}\n"
         prompt += f"- SHA256: {file_metadata.get('hashes', {}).get('sha256', 'Unknown')}\n"
 
-    completion = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[{"role": "system", "content": "You are a forensic expert AI."}, {"role": "user", "content": prompt}],
-        temperature=0.3
-    )
-    return completion.choices[0].message.content
+    prompt_hash = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+    return _groq_complete(prompt_hash, api_key, prompt)
+
+def get_direct_ai_insights_batch(files: List[Tuple[str, Any]]) -> List[str]:
+    """Get AI insights for several (name, data) files using one request per AI_BATCH_SIZE files."""
+    api_key = os.environ.get("GROQ_API_KEY")
+    if not api_key: return ["API Key Missing."] * len(files)
+    
+    results = []
+    for start in range(0, len(files), AI_BATCH_SIZE):
+        batch = files[start:start + AI_BATCH_SIZE]
+        
+        prompt = (
+            "Analyze each file below separately for forensic anomalies. "
+            'Reply with a JSON object {"results": [...]} holding one analysis string per file, in the order given.\n'
+        )
+        for name, file_data in batch:
+            prompt += f"\n---FILE {name} START---\n{_prompt_text(file_data, 2000)}\n---FILE {name} END---\n"
+        
+        prompt_hash = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+        reply = _groq_complete(prompt_hash, api_key, prompt, json_mode=True)
+        
+        try:
+            analyses = json.loads(reply)["results"]
+        except (ValueError, KeyError, TypeError):
+            analyses = None
+        
+        if isinstance(analyses, list) and len(analyses) == len(batch):
+            results.extend(str(a) for a in analyses)
+        else:
+            # Malformed batch reply: fall back to one request per file
+            results.extend(get_direct_ai_insights(file_data) for _, file_data in batch)
+    
+    return results
+
+def get_verification_status(ai_text: str) -> Tuple[str, str]:
+    """Map AI insights to (threat level, integrity score)."""
+    if _BREACH_RE.search(ai_text):
+        return "CRITICAL", "40%"
+    return "CLEAN", "100%"
 
 def main():
     # Sidebar - Case Investigator
@@ -101,70 +212,46 @@ def main():
     st.sidebar.markdown("### Evidence Locker")
     
     if uploaded_file:
-        # Create a temporary file to analyze
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{uploaded_file.name}") as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_file_path = tmp_file.name
+        # Analyze file metadata (cached per upload across reruns)
+        file_metadata = get_cached_file_metadata(uploaded_file.file_id, uploaded_file)
         
-        try:
-            # Analyze file metadata
-            file_metadata = analyze_file_metadata(tmp_file_path)
-            
-            if file_metadata:
-                with st.sidebar.expander(f"📁 {uploaded_file.name}", expanded=True):
-                    st.markdown(f"**Size:** {file_metadata['size']} bytes")
-                    st.markdown(f"**Hash (MD5):** {file_metadata['hashes']['md5']}")
-                    st.markdown(f"**Hash (SHA256):** {file_metadata['hashes']['sha256']}")
-                    st.markdown(f"**Verified Mimetype:** {file_metadata['type']['mime_type']}")
-                    st.markdown(f"**Description:** {file_metadata['type']['description']}")
-            else:
-                st.sidebar.error("Failed to analyze file metadata")
-        finally:
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
+        if file_metadata:
+            with st.sidebar.expander(f"📁 {uploaded_file.name}", expanded=True):
+                st.markdown(f"**Size:** {file_metadata['size']} bytes")
+                st.markdown(f"**Hash (MD5):** {file_metadata['hashes']['md5']}")
+                st.markdown(f"**Hash (SHA256):** {file_metadata['hashes']['sha256']}")
+                st.markdown(f"**Verified Mimetype:** {file_metadata['type']['mime_type']}")
+                st.markdown(f"**Description:** {file_metadata['type']['description']}")
+        else:
+            st.sidebar.error("Failed to analyze file metadata")
     
     # Audit Button
     st.sidebar.markdown("---")
     if st.sidebar.button("RUN FORENSIC AUDIT", use_container_width=True):
         if uploaded_file:
             st.session_state.audit_triggered = True
-            file_content = bytes(uploaded_file.getvalue())
+            # getvalue() shares the upload's buffer; no copy is made
+            file_content = uploaded_file.getvalue()
             
             # Analyze file metadata
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{uploaded_file.name}") as tmp_file:
-                tmp_file.write(file_content)
-                tmp_file_path = tmp_file.name
+            file_metadata = get_cached_file_metadata(uploaded_file.file_id, uploaded_file)
+            hashes = file_metadata['hashes'] if file_metadata else calculate_file_hashes(file_content, algorithms=('md5', 'sha256'))
+            file_type = file_metadata['type'] if file_metadata else get_file_type(file_content)
+            
+            st.session_state.file_results = {
+                'hashes': hashes,
+                'file_type': file_type,
+                'name': uploaded_file.name,
+                'metadata': file_metadata
+            }
             
-            try:
-                file_metadata = analyze_file_metadata(tmp_file_path)
-                hashes = file_metadata['hashes'] if file_metadata else calculate_file_hashes(file_content)
-                file_type = file_metadata['type'] if file_metadata else get_file_type(file_content)
-                
-                st.session_state.file_results = {
-                    'hashes': hashes,
-                    'file_type': file_type,
-                    'name': uploaded_file.name,
-                    'content': file_content,
-                    'metadata': file_metadata
-                }
-                
-                with st.spinner("AUDITING EVIDENCE..."):
-                    try:
-                        insights = get_direct_ai_insights(file_content, file_metadata)
-                        st.session_state.ai_insights = insights
-                        if any(word in insights.lower() for word in ['malicious', 'breach', 'tampered', 'anomaly']):
-                            st.session_state.threat_level = "CRITICAL"
-                            st.session_state.integrity_score = "40%"
-                        else:
-                            st.session_state.threat_level = "CLEAN"
-                            st.session_state.integrity_score = "100%"
-                    except Exception as e:
-                        st.session_state.ai_insights = f"AUDIT ERROR: {str(e)}"
-            finally:
-                # Clean up temporary file
-                os.unlink(tmp_file_path)
+            with st.spinner("AUDITING EVIDENCE..."):
+                try:
+                    insights = get_direct_ai_insights(file_content, file_metadata)
+                    st.session_state.ai_insights = insights
+                    st.session_state.threat_level, st.session_state.integrity_score = get_verification_status(insights)
+                except Exception as e:
+                    st.session_state.ai_insights = f"AUDIT ERROR: {str(e)}"
         else:
             st.sidebar.warning("UPLOAD EVIDENCE BEFORE AUDIT")
 
@@ -1,46 +1,259 @@
 import hashlib
-import magic
+import io
 import logging
-from typing import Dict, Tuple, Optional
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from functools import partial
+from typing import BinaryIO, Dict, List, Tuple, Optional, Union
 
-def calculate_file_hashes(data: bytes) -> Dict[str, str]:
+# Read/hash granularity for large evidence files (1 MiB).
+_CHUNK_SIZE = 1 << 20
+
+# From this size on, extra digests run on a worker thread alongside the last
+# one. hashlib releases the GIL while digesting, so the passes overlap.
+_PARALLEL_HASH_MIN = 4 * _CHUNK_SIZE
+
+# Worker for the offloaded digests; its thread starts on first use.
+_HASH_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='hash')
+
+# Below this many bytes in total, hash_files uses threads instead of processes;
+# the IPC and process start-up would cost more than the hashing itself.
+_PROCESS_POOL_MIN_BYTES = 64 * _CHUNK_SIZE
+
+# libmagic's MAGIC_PARAM_BYTES_MAX, the most it scans of any buffer; read
+# from the library on first use (None until then).
+_MAGIC_BYTES_MAX = None
+
+# Leading signatures whose libmagic MIME type is fixed; a match skips the
+# libmagic MIME pass (the description still comes from libmagic).
+_MAGIC_SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR', 'image/png'),
+    (b'\xff\xd8\xff\xe0', 'image/jpeg'),
+    (b'\xff\xd8\xff\xe1', 'image/jpeg'),
+    (b'\xff\xd8\xff\xdb', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+# _MAGIC_SIGNATURES compiled into (length, {prefix: mime}) probes, longest
+# first, so adding signatures only adds work when it adds a new length.
+_SIGNATURE_INDEX = tuple(
+    (length, {sig: mime for sig, mime in _MAGIC_SIGNATURES if len(sig) == length})
+    for length in sorted({len(sig) for sig, _ in _MAGIC_SIGNATURES}, reverse=True)
+)
+
+# SQLite file holding path-based hashes keyed by (path, size, mtime_ns).
+HASH_CACHE_PATH = '.axiom_hash_cache.db'
+
+def _new_hash(algorithm: str, data=b''):
+    """Create a hashlib object; MD5 is flagged as a non-security fingerprint."""
+    return hashlib.new(algorithm, data, usedforsecurity=algorithm != 'md5')
+
+def _update_all(hashers, chunk) -> None:
+    """Feed one chunk to several hashlib objects."""
+    for hasher in hashers:
+        hasher.update(chunk)
+
+def calculate_file_hashes(
+    data: Union[bytes, bytearray, memoryview, BinaryIO],
+    *,
+    algorithms: Tuple[str, ...] = ('sha256',),
+    overlap: bool = True
+) -> Dict[str, str]:
     """
-    Calculate MD5 and SHA-256 hashes of file data.
+    Calculate hashes of file data; SHA-256 only unless asked for more.
+    
+    Buffers are handed to OpenSSL in a single call per digest (no
+    Python-level loop, GIL released); file objects are read once, chunk by
+    chunk, and every chunk feeds all digests. Past _PARALLEL_HASH_MIN bytes
+    the extra digests are computed on a worker thread while the last one
+    runs on the caller's, unless overlap is off.
     
     Args:
-        data (bytes): File content as bytes
+        data (bytes | bytearray | memoryview | BinaryIO): File content as a
+            bytes-like object or a binary file object positioned at the start
+        algorithms (Tuple[str, ...]): hashlib algorithm names, e.g.
+            ('md5', 'sha256')
+        overlap (bool): Allow the worker thread; callers that already hash
+            in parallel pass False to keep every digest on their own thread
         
     Returns:
-        Dict[str, str]: Dictionary containing hash values
+        Dict[str, str]: Dictionary mapping each algorithm to its hex digest
     """
     try:
-        md5_hash = hashlib.md5(data).hexdigest()
-        sha256_hash = hashlib.sha256(data).hexdigest()
+        *offloaded, last = algorithms
+        if not overlap:
+            offloaded = []
         
-        return {
-            'md5': md5_hash,
-            'sha256': sha256_hash
-        }
+        if hasattr(data, 'readinto'):
+            hashers = [_new_hash(a) for a in algorithms]
+            # Two alternating buffers: the next chunk is read into one while
+            # the worker may still be hashing the other.
+            views = (memoryview(bytearray(_CHUNK_SIZE)), memoryview(bytearray(_CHUNK_SIZE)))
+            pending = None
+            index = 0
+            total = 0
+            while size := data.readinto(views[index]):
+                chunk = views[index][:size]
+                total += size
+                if pending is not None:
+                    pending.result()
+                    pending = None
+                # Small streams never leave the caller's thread
+                if offloaded and total > _PARALLEL_HASH_MIN:
+                    pending = _HASH_EXECUTOR.submit(_update_all, hashers[:-1], chunk)
+                else:
+                    _update_all(hashers[:-1], chunk)
+                hashers[-1].update(chunk)
+                index ^= 1
+            if pending is not None:
+                pending.result()
+        elif offloaded and len(data) >= _PARALLEL_HASH_MIN:
+            pending = _HASH_EXECUTOR.submit(lambda: [_new_hash(a, data) for a in offloaded])
+            final = _new_hash(last, data)
+            hashers = pending.result() + [final]
+        else:
+            hashers = [_new_hash(a, data) for a in algorithms]
+        
+        return {a: h.hexdigest() for a, h in zip(algorithms, hashers)}
     except Exception as e:
         logging.error(f"Error calculating file hashes: {e}")
-        return {'md5': 'Error', 'sha256': 'Error'}
+        return {a: 'Error' for a in algorithms}
 
-def get_file_type(data: bytes) -> Dict[str, str]:
+def hash_file(
+    path_or_fp: Union[str, os.PathLike, BinaryIO],
+    *,
+    algorithms: Tuple[str, ...] = ('sha256',),
+    overlap: bool = True
+) -> Dict[str, str]:
+    """
+    Calculate hashes of a file on disk or an open file.
+    
+    The file is streamed in _CHUNK_SIZE pieces, so memory use stays flat
+    regardless of file size.
+    
+    Args:
+        path_or_fp (str | PathLike | BinaryIO): Path to the file or a binary
+            file object positioned at the start
+        algorithms (Tuple[str, ...]): hashlib algorithm names
+        overlap (bool): Allow the extra digests on the worker thread
+        
+    Returns:
+        Dict[str, str]: Dictionary mapping each algorithm to its hex digest
+    """
+    if hasattr(path_or_fp, 'readinto'):
+        return calculate_file_hashes(path_or_fp, algorithms=algorithms, overlap=overlap)
+    
+    try:
+        with open(path_or_fp, 'rb') as f:
+            return calculate_file_hashes(f, algorithms=algorithms, overlap=overlap)
+    except OSError as e:
+        logging.error(f"Error opening {path_or_fp} for hashing: {e}")
+        return {a: 'Error' for a in algorithms}
+
+def hash_files(
+    paths: List[Union[str, os.PathLike]],
+    workers: Optional[int] = None,
+    *,
+    algorithms: Tuple[str, ...] = ('sha256',)
+) -> List[Dict[str, str]]:
+    """
+    Hash many files in parallel, one file per task.
+    
+    Large batches go to a process pool so each worker has its own
+    interpreter and OpenSSL contexts; small batches use threads, which
+    also scale because hashlib releases the GIL while digesting.
+    
+    Args:
+        paths (List[str | PathLike]): Files to hash
+        workers (Optional[int]): Pool size, defaults to os.cpu_count()
+        algorithms (Tuple[str, ...]): hashlib algorithm names
+        
+    Returns:
+        List[Dict[str, str]]: Hash values for each path, in input order
+    """
+    if not paths:
+        return []
+    
+    workers = workers or os.cpu_count() or 1
+    # Each task hashes inline: the pool is the parallelism, and funnelling
+    # every file's extra digests through the one shared worker would
+    # serialise them.
+    task = partial(hash_file, algorithms=algorithms, overlap=False)
+    
+    total_bytes = 0
+    for path in paths:
+        try:
+            total_bytes += os.path.getsize(path)
+        except OSError:
+            pass
+    
+    if workers == 1 or len(paths) == 1 or total_bytes < _PROCESS_POOL_MIN_BYTES:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(task, paths))
+    
+    # spawn: forking a process that already runs threads (Streamlit's, the
+    # hash worker) can leave children holding locks no thread will release
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(task, paths, chunksize=chunksize))
+
+def _magic_bytes_max(magic) -> int:
+    """Return how many leading bytes libmagic scans, or -1 if it won't say."""
+    global _MAGIC_BYTES_MAX
+    if _MAGIC_BYTES_MAX is None:
+        try:
+            _MAGIC_BYTES_MAX = magic.Magic().getparam(magic.MAGIC_PARAM_BYTES_MAX)
+        except (AttributeError, NotImplementedError, magic.MagicException):
+            _MAGIC_BYTES_MAX = -1
+    return _MAGIC_BYTES_MAX
+
+def get_file_type(data: Union[bytes, bytearray, memoryview, BinaryIO]) -> Dict[str, str]:
     """
     Identify file type using Magic Byte analysis.
     
+    bytes are handed to libmagic as they are; file objects and other
+    buffers are read or copied only up to libmagic's own scan limit
+    (bytes_max), so the description matches a full-buffer scan.
+    
     Args:
-        data (bytes): File content as bytes
+        data (bytes | bytearray | memoryview | BinaryIO): File content as a
+            bytes-like object or a seekable binary file object
         
     Returns:
         Dict[str, str]: Dictionary containing file type information
     """
     try:
-        # Get MIME type
-        mime_type = magic.from_buffer(data, mime=True)
+        # Deferred so importing this module doesn't load libmagic
+        import magic
+        
+        if isinstance(data, bytes):
+            head = data
+        elif hasattr(data, 'read'):
+            position = data.tell()
+            head = data.read(_magic_bytes_max(magic))
+            data.seek(position)
+        else:
+            # libmagic needs a real bytes object; copy only what it scans
+            bytes_max = _magic_bytes_max(magic)
+            view = memoryview(data)
+            head = bytes(view[:bytes_max] if bytes_max >= 0 else view)
+        
+        # Get MIME type, from the signature table when possible
+        mime_type = None
+        for length, signatures in _SIGNATURE_INDEX:
+            mime_type = signatures.get(head[:length])
+            if mime_type is not None:
+                break
+        if mime_type is None:
+            mime_type = magic.from_buffer(head, mime=True)
         
         # Get human-readable description
-        file_description = magic.from_buffer(data)
+        file_description = magic.from_buffer(head)
         
         return {
             'mime_type': mime_type,
@@ -50,35 +263,142 @@ def get_file_type(data: bytes) -> Dict[str, str]:
         logging.error(f"Error identifying file type: {e}")
         return {'mime_type': 'Unknown', 'description': 'Error'}
 
-def analyze_file_metadata(file_path: str) -> Optional[Dict]:
+def _hash_cache_key(file_path: str, stat: os.stat_result) -> Tuple[str, int, int]:
+    """Build the (absolute path, size, mtime_ns) hash cache key for a file."""
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+def _hash_cache_lookup(key: Tuple[str, int, int]) -> Optional[Dict[str, str]]:
     """
-    Comprehensive file analysis including hashes and type identification.
+    Fetch previously computed hashes for an unchanged file.
     
     Args:
-        file_path (str): Path to the file to analyze
+        key (Tuple[str, int, int]): Absolute path, size and mtime in ns
+        
+    Returns:
+        Optional[Dict[str, str]]: Cached hash values or None on a miss
+    """
+    try:
+        with closing(sqlite3.connect(HASH_CACHE_PATH)) as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS h(path TEXT, size INT, mtime INT, md5 TEXT, sha256 TEXT, '
+                'PRIMARY KEY(path, size, mtime))'
+            )
+            row = conn.execute(
+                'SELECT md5, sha256 FROM h WHERE path = ? AND size = ? AND mtime = ?', key
+            ).fetchone()
+    except sqlite3.Error as e:
+        logging.error(f"Error reading hash cache: {e}")
+        return None
+    
+    return {'md5': row[0], 'sha256': row[1]} if row else None
+
+def _hash_cache_store(key: Tuple[str, int, int], hashes: Dict[str, str]) -> None:
+    """
+    Record hashes for a file, replacing rows left by older versions of it.
+    
+    Args:
+        key (Tuple[str, int, int]): Absolute path, size and mtime in ns
+        hashes (Dict[str, str]): Hash values to store
+    """
+    try:
+        with closing(sqlite3.connect(HASH_CACHE_PATH)) as conn, conn:
+            conn.execute('DELETE FROM h WHERE path = ?', (key[0],))
+            conn.execute(
+                'INSERT INTO h(path, size, mtime, md5, sha256) VALUES (?, ?, ?, ?, ?)',
+                (*key, hashes['md5'], hashes['sha256'])
+            )
+    except sqlite3.Error as e:
+        logging.error(f"Error writing hash cache: {e}")
+
+def analyze_file_content(data: Union[bytes, bytearray, memoryview], label: str) -> Optional[Dict]:
+    """
+    Comprehensive analysis of a file already held in memory.
+    
+    Hashing and type detection share one zero-copy view of the buffer: the
+    digests read it in place and libmagic scans it up to its bytes_max.
+    
+    Args:
+        data (bytes | bytearray | memoryview): File content
+        label (str): Path or name reported for the file
         
     Returns:
         Optional[Dict]: File metadata or None if analysis fails
     """
     try:
-        with open(file_path, 'rb') as f:
-            file_data = f.read()
+        view = memoryview(data)
         
+        return {
+            'path': label,
+            'size': view.nbytes,
+            'hashes': calculate_file_hashes(view, algorithms=('md5', 'sha256')),
+            'type': get_file_type(data if isinstance(data, bytes) else view)
+        }
+    except Exception as e:
+        logging.error(f"Error analyzing file {label}: {e}")
+        return None
+
+def analyze_file_object(file_obj: BinaryIO, label: str, hashes: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+    """
+    Comprehensive analysis of an open binary file without loading it whole.
+    
+    Args:
+        file_obj (BinaryIO): Seekable binary file object (e.g. an upload)
+        label (str): Path or name reported for the file
+        hashes (Optional[Dict[str, str]]): Precomputed hash values; the
+            hashing pass is skipped when given
+        
+    Returns:
+        Optional[Dict]: File metadata or None if analysis fails
+    """
+    try:
         # Get file size
-        file_size = len(file_data)
+        file_size = file_obj.seek(0, io.SEEK_END)
         
-        # Calculate hashes
-        hashes = calculate_file_hashes(file_data)
+        # Get file type from the bytes libmagic would scan
+        file_obj.seek(0)
+        file_type = get_file_type(file_obj)
         
-        # Get file type
-        file_type = get_file_type(file_data)
+        # Calculate hashes in a single streamed pass
+        if hashes is None:
+            file_obj.seek(0)
+            hashes = calculate_file_hashes(file_obj, algorithms=('md5', 'sha256'))
         
         return {
-            'path': file_path,
+            'path': label,
             'size': file_size,
             'hashes': hashes,
             'type': file_type
         }
+    except Exception as e:
+        logging.error(f"Error analyzing file {label}: {e}")
+        return None
+
+def analyze_file_metadata(file_path: str, use_hash_cache: bool = False) -> Optional[Dict]:
+    """
+    Comprehensive file analysis including hashes and type identification.
+    
+    With use_hash_cache, hashes of a file whose size and mtime are unchanged
+    since the last run are read from HASH_CACHE_PATH instead of recomputed.
+    Timestamps can be forged, so leave it off when verifying evidence.
+    
+    Args:
+        file_path (str): Path to the file to analyze
+        use_hash_cache (bool): Reuse hashes from the on-disk cache
+        
+    Returns:
+        Optional[Dict]: File metadata or None if analysis fails
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if not use_hash_cache:
+                return analyze_file_object(f, file_path)
+            
+            key = _hash_cache_key(file_path, os.fstat(f.fileno()))
+            cached = _hash_cache_lookup(key)
+            result = analyze_file_object(f, file_path, hashes=cached)
+            if cached is None and result and 'Error' not in result['hashes'].values():
+                _hash_cache_store(key, result['hashes'])
+            return result
     except Exception as e:
         logging.error(f"Error analyzing file {file_path}: {e}")
-        return None
\ No newline at end of file
+        return None
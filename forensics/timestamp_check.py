@@ -1,3 +1,28 @@
+from types import MappingProxyType
+
+import numpy as np
+
+# Lead-to-payment latency (seconds) below which a transaction is flagged.
+ZERO_LATENCY_THRESHOLD = 0.5
+
+# Shared, read-only results of check_timestamps; built once, never per call.
+_FRAUD_RESULT = MappingProxyType(
+    {
+        "verdict": "FRAUD ALERT: Zero-Latency Paradox",
+        "remediation_tip": (
+            "Internal systems suggest this is likely bot-generated traffic. "
+            "Investigate the Lead Source IP."
+        ),
+    }
+)
+_VERIFIED_RESULT = MappingProxyType(
+    {
+        "verdict": "Verification Successful",
+        "remediation_tip": "Metric within healthy human-interaction bounds.",
+    }
+)
+
+
 def check_timestamps(lead_created_at, payment_processed_at):
     """
     Compare two timestamps and flag suspiciously low latency.
@@ -11,22 +36,61 @@ def check_timestamps(lead_created_at, payment_processed_at):
 
     Returns
     -------
-    dict
-        Contains a 'verdict' string and a 'remediation_tip' string.
+    Mapping
+        Contains a 'verdict' string and a 'remediation_tip' string. The
+        mapping is shared between calls and read-only; copy it with
+        ``dict(...)`` before modifying.
     """
     latency = abs(payment_processed_at - lead_created_at)
 
-    if latency < 0.5:
-        return {
-            "verdict": "FRAUD ALERT: Zero-Latency Paradox",
-            "remediation_tip": (
-                "Internal systems suggest this is likely bot-generated traffic. "
-                "Investigate the Lead Source IP."
-            ),
-        }
+    if latency < ZERO_LATENCY_THRESHOLD:
+        return _FRAUD_RESULT
 
-    return {
-        "verdict": "Verification Successful",
-        "remediation_tip": "Metric within healthy human-interaction bounds.",
-    }
+    return _VERIFIED_RESULT
+
+
+def check_timestamps_array(lead_created_at, payment_processed_at):
+    """
+    Vectorized form of `check_timestamps` for whole columns of timestamps.
+
+    Parameters
+    ----------
+    lead_created_at : array_like of float
+        Timestamps when the leads were created.
+    payment_processed_at : array_like of float
+        Timestamps when the matching payments were processed.
+
+    Returns
+    -------
+    numpy.ndarray of bool
+        True where the pair would get the "Zero-Latency Paradox" verdict.
+    """
+    lead = np.asarray(lead_created_at, dtype=np.float64)
+    payment = np.asarray(payment_processed_at, dtype=np.float64)
+    return np.abs(payment - lead) < ZERO_LATENCY_THRESHOLD
+
+
+def count_zero_latency(lead_created_at, payment_processed_at):
+    """
+    Count the pairs `check_timestamps` would flag.
+
+    Parameters
+    ----------
+    lead_created_at : array_like of float
+        Timestamps when the leads were created.
+    payment_processed_at : array_like of float
+        Timestamps when the matching payments were processed.
+
+    Returns
+    -------
+    int
+        Number of "Zero-Latency Paradox" pairs.
+    """
+    lead = np.asarray(lead_created_at, dtype=np.float64)
+    payment = np.asarray(payment_processed_at, dtype=np.float64)
+    if lead.shape != payment.shape:
+        raise ValueError(
+            f"timestamp arrays differ in shape: {lead.shape} vs {payment.shape}"
+        )
 
+    return int(np.count_nonzero(check_timestamps_array(lead, payment)))
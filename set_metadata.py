@@ -6,7 +6,8 @@ Script to set metadata properties on the metadata_trap.csv file
 import os
 import sys
 from datetime import datetime
-import subprocess
+
+from add_custom_metadata import TRAP_DATE, set_file_times
 
 def set_file_metadata():
     """Set metadata properties on the CSV file"""
@@ -20,25 +21,15 @@ def set_file_metadata():
     
     try:
         # Set file creation date to future date (2026-12-25)
-        # Note: This is a Windows-specific operation
-        future_date = "2026-12-25"
+        # Note: creation time can only be set on Windows
+        future_date = TRAP_DATE.strftime("%Y-%m-%d")
         print(f"Setting creation date to: {future_date}")
         
-        # On Windows, we can use PowerShell to set file properties
-        if os.name == 'nt':  # Windows
-            # Set creation time using PowerShell
-            ps_command = f'''
-            $file = Get-Item "{csv_file}"
-            $file.CreationTime = "2026-12-25"
-            $file.LastWriteTime = "2026-12-25"
-            $file.LastAccessTime = "2026-12-25"
-            '''
-            
-            try:
-                subprocess.run(['powershell', '-Command', ps_command], check=True)
-                print("✓ File timestamps updated successfully")
-            except subprocess.CalledProcessError as e:
-                print(f"Warning: Could not set file timestamps: {e}")
+        try:
+            set_file_times(csv_file, TRAP_DATE)
+            print("✓ File timestamps updated successfully")
+        except OSError as e:
+            print(f"Warning: Could not set file timestamps: {e}")
         
         # Create a simple metadata file to document the trap
         metadata_doc = f"""